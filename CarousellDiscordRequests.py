@@ -13,16 +13,112 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException,
 import re
 import logging
 from config import Config
-from database import Database
 from discord_notifier import DiscordNotifier
+from listing_store import ListingStore, page_below_watermark, DB_PATH
+from sellers import SellerFilter
+from delivery_worker import DeliveryWorker
+from listing import Listing
+from regions import DEFAULT_REGION, RegionMetrics, get_region
 
 logger = logging.getLogger(__name__)
 
+# Evaluates every candidate XPath against the live DOM in one round trip and
+# returns, per selector, its match count, the cost of document.evaluate alone
+# (ms), the cost of reading samples (sample_ms) and the fields
+# extract_basic_info needs from the first few matches.
+SELECTOR_PROBE_SCRIPT = """
+const selectors = arguments[0];
+const sampleLimit = arguments[1];
+const currency = arguments[2];
+const first = (node, xpath) =>
+    document.evaluate(xpath, node, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+return selectors.map((selector) => {
+    const probe = {selector: selector, count: 0, samples: [], ms: 0, sample_ms: 0, error: null};
+    let started = performance.now();
+    let nodes = null;
+    try {
+        nodes = document.evaluate(selector, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    } catch (e) {
+        probe.error = String(e);
+    }
+    probe.ms = performance.now() - started;
+    if (!nodes) {
+        return probe;
+    }
+    probe.count = nodes.snapshotLength;
+    started = performance.now();
+    try {
+        for (let i = 0; i < Math.min(nodes.snapshotLength, sampleLimit); i++) {
+            const node = nodes.snapshotItem(i);
+            const link = first(node, ".//a[contains(@href, '/p/')]");
+            const alt = first(node, ".//img[@alt]");
+            const nike = first(node, ".//*[contains(text(), 'Nike') or contains(text(), 'nike')]");
+            const price = first(node, ".//*[contains(text(), '" + currency + "')]");
+            const img = first(node, ".//img[@src]");
+            probe.samples.push({
+                text: (node.innerText || '').slice(0, 100),
+                href: link ? link.href : null,
+                alt: alt ? alt.getAttribute('alt') : null,
+                nikeText: nike ? nike.innerText : null,
+                priceText: price ? price.innerText : null,
+                src: img ? img.src : null,
+            });
+        }
+    } catch (e) {
+        probe.error = String(e);
+    }
+    probe.sample_ms = performance.now() - started;
+    return probe;
+});
+"""
+
 class CarousellScraper:
-    def __init__(self):
-        self.db = Database()
-        self.notifier = DiscordNotifier()
+    SEARCH_QUERY = 'nike shoes'
+    PAGE_SIZE = 20
+    MAX_PAGES = 10
+    # Stop paginating once this share of a page is at or below the query's watermark
+    STALE_PAGE_RATIO = 0.8
+    ALTERNATIVE_SELECTORS = [
+        "//a[contains(@href, '/p/')]",  # Any link to product page
+        "//div[contains(@class, 'listing')]",  # Generic listing class
+        "//*[contains(@data-testid, 'listing')]",  # Any listing testid
+        "//*[contains(@data-testid, 'card')]",  # Any card testid
+        "//div[contains(@class, 'card')]",  # Generic card class
+        "//article",  # Article tags often contain listings
+        "//*[contains(text(), '{currency}')]//ancestor::*[3]"  # Find elements containing prices
+    ]
+
+    def __init__(self, base_url=None, search_url=None, notifier=None, db_path=DB_PATH,
+                 region=DEFAULT_REGION, rate_budget=None, deliver=True):
+        self.region = get_region(region)
+        if base_url:
+            self.region = self.region.at(base_url.rstrip('/'))
+        self.base_url = self.region.base_url
+        if search_url is None:
+            # Config.SEARCH_URL points at the live MY site, so it only applies to the unmodified MY profile
+            use_config = self.region is get_region(DEFAULT_REGION)
+            search_url = Config.SEARCH_URL if use_config else self.region.search_url(self.SEARCH_QUERY)
+        self.search_url = search_url
+        self.rate_budget = rate_budget
+        self.metrics = RegionMetrics(self.region.code)
+        self.notifier = notifier or DiscordNotifier()
+        self.store = ListingStore(db_path)
+        self.seller_filter = SellerFilter.from_env()
+        # With several regional scrapers in one process, a single shared worker does the delivering
+        self.delivery_worker = DeliveryWorker(self.notifier, self.store.db_path) if deliver else None
+        if self.delivery_worker:
+            self.delivery_worker.start()
         self.driver = None
+        # Cards already scraped on the current search page; "Show more results" appends below them
+        self.cards_scraped = 0
+        # Whether the last crawl paged down to the watermark, rather than stopping early
+        self.crawl_complete = False
+
+    def throttle(self):
+        """Waits for this region's rate budget before a request to Carousell."""
+        if self.rate_budget:
+            self.rate_budget.acquire()
+        self.metrics.increment('requests')
 
     def create_driver(self, headless=True):
         """Initializes and returns a Chrome WebDriver instance with maximum stealth."""
@@ -46,7 +142,7 @@ class CarousellScraper:
         opts.add_argument("--disable-blink-features=AutomationControlled")
         opts.add_experimental_option('excludeSwitches', ['enable-automation', 'enable-logging'])
         opts.add_experimental_option('useAutomationExtension', False)
-        opts.add_argument("--lang=en-US,en;q=0.9")
+        opts.add_argument(f"--lang={self.region.accept_language()}")
         
         # Rotate user agents to appear more human
         user_agents = [
@@ -67,7 +163,7 @@ class CarousellScraper:
             # Execute comprehensive stealth scripts
             driver.execute_cdp_cmd('Network.setUserAgentOverride', {
                 "userAgent": user_agent,
-                "acceptLanguage": "en-US,en;q=0.9",
+                "acceptLanguage": self.region.accept_language(),
                 "platform": "Win32"
             })
             
@@ -75,7 +171,7 @@ class CarousellScraper:
             stealth_scripts = [
                 "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})",
                 "Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]})",
-                "Object.defineProperty(navigator, 'languages', {get: () => ['en-US', 'en']})",
+                f"Object.defineProperty(navigator, 'languages', {{get: () => ['{self.region.locale}', '{self.region.language}']}})",
                 "Object.defineProperty(navigator, 'permissions', {get: () => ({query: () => Promise.resolve({state: 'granted'})})})",
                 "Object.defineProperty(navigator, 'hardwareConcurrency', {get: () => 4})",
                 "Object.defineProperty(navigator, 'deviceMemory', {get: () => 8})",
@@ -95,19 +191,22 @@ class CarousellScraper:
 
         return driver
 
-    def scrape_current_page(self, driver):
-        """Scrapes listing information from the current page."""
+    def scrape_current_page(self, driver, start_index=0):
+        """Scrapes listing information from the current page, skipping the first start_index cards."""
         listings_data = []
+        self.cards_scraped = start_index
+        card_xpath = f"(//div[contains(@data-testid, 'listing-card-')])[position() > {start_index}]"
         # Wait for listing cards to be present
         try:
             WebDriverWait(driver, 15).until(
-                EC.presence_of_all_elements_located((By.XPATH, "//div[contains(@data-testid, 'listing-card-')]"))
+                EC.presence_of_all_elements_located((By.XPATH, card_xpath))
             )
         except TimeoutException:
             logger.warning("No listing cards found on the page.")
             return listings_data
 
-        item_divs = driver.find_elements(By.XPATH, "//div[contains(@data-testid, 'listing-card-')]")
+        item_divs = driver.find_elements(By.XPATH, card_xpath)
+        self.cards_scraped = start_index + len(item_divs)
         logger.info(f"Found {len(item_divs)} item divs.")
 
         for i, item_div in enumerate(item_divs):
@@ -178,7 +277,8 @@ class CarousellScraper:
                             item['price'] = price_element.text.strip()
                     except NoSuchElementException:
                         # Fallback: any p that looks like a price (e.g., starts with RM)
-                        price_element = product_link_element.find_element(By.XPATH, ".//p[starts-with(normalize-space(text()), 'RM') or contains(normalize-space(text()), 'RM')]")
+                        currency = self.region.currency
+                        price_element = product_link_element.find_element(By.XPATH, f".//p[starts-with(normalize-space(text()), '{currency}') or contains(normalize-space(text()), '{currency}')]")
                         item['price'] = price_element.text.strip()
             except NoSuchElementException:
                 logger.warning(f"Price element not found for item {i+1} (ID: {item['product_id']})")
@@ -272,6 +372,7 @@ class CarousellScraper:
                 EC.element_to_be_clickable((By.XPATH, "//button[contains(text(),'Show more results')]"))
             )
             logger.info(f"--- Show More Results Button OuterHTML ---\n{show_more_button.get_attribute('outerHTML')}\n---")
+            self.throttle()
             # Scroll to the button to ensure it's in view and clickable, centered
             driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", show_more_button)
             time.sleep(2)
@@ -297,16 +398,22 @@ class CarousellScraper:
         try:
             listings = self.scrape_with_direct_requests()
             if listings:
-                return self.process_listings(listings)
+                result = self.process_listings(listings)
+                self.store.advance_watermark(self.SEARCH_QUERY, listings, self.region.code, complete=self.crawl_complete)
+                return result
         except Exception as e:
+            self.metrics.increment('errors')
             logger.warning(f"Direct API approach failed: {e}")
         
         # Fallback to browser approach if API fails
         try:
             listings = self.scrape_with_browser()
             if listings:
-                return self.process_listings(listings)
+                result = self.process_listings(listings)
+                self.store.advance_watermark(self.SEARCH_QUERY, listings, self.region.code, complete=self.crawl_complete)
+                return result
         except Exception as e:
+            self.metrics.increment('errors')
             logger.error(f"Browser approach also failed: {e}")
         
         # Test Discord notification system with a sample product
@@ -315,8 +422,8 @@ class CarousellScraper:
         test_product = {
             'product_id': 'test_nike_' + str(int(time.time())),
             'title': 'Nike Air Force 1 Low - TEST LISTING',
-            'price': 'RM 120',
-            'link': 'https://www.carousell.com.my/p/test-nike-shoes-12345',
+            'price': self.region.format_price(120),
+            'link': f'{self.base_url}/p/test-nike-shoes-12345',
             'img': 'https://via.placeholder.com/300x300?text=Nike+Test',
             'seller_name': 'Test Seller',
             'time_posted': 'Just now',
@@ -339,12 +446,13 @@ class CarousellScraper:
     def scrape_with_direct_requests(self):
         """Try to scrape using direct HTTP requests mimicking mobile app."""
         logger.info("Trying direct API approach...")
+        self.crawl_complete = False
         
         # Mobile app headers that are less likely to be blocked
         headers = {
             'User-Agent': 'Carousell/6.62.0 (iPhone; iOS 17.1.1; Scale/3.00)',
             'Accept': 'application/json, text/plain, */*',
-            'Accept-Language': 'en-US,en;q=0.9',
+            'Accept-Language': self.region.accept_language(),
             'Accept-Encoding': 'gzip, deflate, br',
             'Connection': 'keep-alive',
             'Content-Type': 'application/json',
@@ -352,73 +460,99 @@ class CarousellScraper:
             'Sec-Fetch-Site': 'same-origin',
             'Sec-Fetch-Mode': 'cors',
             'Sec-Fetch-Dest': 'empty',
-            'Referer': 'https://www.carousell.com.my/',
+            'Referer': f'{self.base_url}/',
         }
         
         session = requests.Session()
         session.headers.update(headers)
         
         # Try different API endpoints that mobile apps might use
-        api_endpoints = [
-            'https://www.carousell.com.my/api-service/web/listings/search/',
-            'https://www.carousell.com.my/api/listings/search/',
-            'https://api.carousell.com.my/v1/search/',
-            'https://www.carousell.com.my/_next/data/search.json',
-        ]
+        api_endpoints = self.region.api_endpoints()
         
         search_params = {
-            'query': 'nike shoes',
-            'locale': 'en-MY',
-            'country_code': 'MY',
-            'limit': 20,
+            'query': self.SEARCH_QUERY,
+            'locale': self.region.locale,
+            'country_code': self.region.code,
+            'limit': self.PAGE_SIZE,
             'offset': 0,
             'sort_by': 'recent'
         }
-        
+
         for endpoint in api_endpoints:
             try:
                 logger.info(f"Trying API endpoint: {endpoint}")
-                
+
                 # Try both GET and POST requests
                 for method in ['GET', 'POST']:
                     try:
-                        if method == 'GET':
-                            response = session.get(endpoint, params=search_params, timeout=10)
-                        else:
-                            response = session.post(endpoint, json=search_params, timeout=10)
-                        
-                        logger.info(f"{method} {endpoint} - Status: {response.status_code}")
-                        
-                        if response.status_code == 200:
-                            try:
-                                data = response.json()
-                                logger.info(f"Got JSON response with keys: {list(data.keys()) if isinstance(data, dict) else 'not dict'}")
-                                
-                                # Look for listing data in various possible structures
-                                listings = self.extract_from_api_response(data)
-                                if listings:
-                                    logger.info(f"Successfully extracted {len(listings)} listings from API")
-                                    return listings
-                                    
-                            except json.JSONDecodeError:
-                                # Sometimes API returns HTML, try to parse it
-                                if 'nike' in response.text.lower() and 'rm' in response.text.lower():
-                                    logger.info("Got HTML response, attempting to parse...")
-                                    listings = self.extract_from_html_response(response.text)
-                                    if listings:
-                                        return listings
-                                        
+                        listings = self.fetch_search_page(session, endpoint, method, search_params)
+                        if listings:
+                            logger.info(f"Successfully extracted {len(listings)} listings from API")
+                            return self.paginate_direct_requests(session, endpoint, method, search_params, listings)
+
                     except Exception as e:
                         logger.debug(f"{method} {endpoint} failed: {e}")
                         continue
-                        
+
             except Exception as e:
                 logger.debug(f"API endpoint {endpoint} failed: {e}")
                 continue
-        
+
         logger.warning("All API endpoints failed")
         return []
 
+    def fetch_search_page(self, session, endpoint, method, search_params):
+        """Fetches one page of search results from an API endpoint."""
+        self.throttle()
+        if method == 'GET':
+            response = session.get(endpoint, params=search_params, timeout=10)
+        else:
+            response = session.post(endpoint, json=search_params, timeout=10)
+
+        logger.info(f"{method} {endpoint} - Status: {response.status_code}")
+
+        if response.status_code != 200:
+            return []
+
+        try:
+            data = response.json()
+            logger.info(f"Got JSON response with keys: {list(data.keys()) if isinstance(data, dict) else 'not dict'}")
+
+            # Look for listing data in various possible structures
+            return self.extract_from_api_response(data)
+
+        except json.JSONDecodeError:
+            # Sometimes API returns HTML, try to parse it
+            if 'nike' in response.text.lower() and self.region.currency.lower() in response.text.lower():
+                logger.info("Got HTML response, attempting to parse...")
+                return self.extract_from_html_response(response.text)
+        return []
+
+    def paginate_direct_requests(self, session, endpoint, method, search_params, first_page):
+        """Follows offset pagination on a working endpoint until it reaches already-seen listings."""
+        watermark = self.store.get_watermark(self.SEARCH_QUERY, self.region.code)
+        # Held as compact Listing records; deep pagination can accumulate many pages
+        all_listings = [Listing.from_dict(item) for item in first_page]
+        page = first_page
+        pages = 1
+
+        while pages < self.MAX_PAGES and not page_below_watermark(page, watermark, self.STALE_PAGE_RATIO):
+            page_params = dict(search_params, offset=pages * self.PAGE_SIZE)
+            try:
+                page = self.fetch_search_page(session, endpoint, method, page_params)
+            except Exception as e:
+                logger.warning(f"Stopped paginating {endpoint} at offset {page_params['offset']}: {e}")
+                break
+            if not page:
+                break
+            all_listings.extend(Listing.from_dict(item) for item in page)
+            pages += 1
+
+        # An error, an empty page or MAX_PAGES can end the loop before the stale page is reached
+        self.crawl_complete = page_below_watermark(page, watermark, self.STALE_PAGE_RATIO)
+        logger.info(f"Fetched {pages} page(s) from API (watermark: {watermark}, complete: {self.crawl_complete})")
+        return all_listings
+
     def extract_from_api_response(self, data):
         """Extract product listings from API JSON response."""
         listings = []
@@ -475,9 +609,9 @@ class CarousellScraper:
                 if price_field in item:
                     price_val = item[price_field]
                     if isinstance(price_val, dict) and 'amount' in price_val:
-                        product['price'] = f"RM {price_val['amount']}"
+                        product['price'] = self.region.format_price(price_val['amount'])
                     elif price_val:
-                        product['price'] = f"RM {price_val}"
+                        product['price'] = self.region.format_price(price_val)
                     break
             
             # Extract image
@@ -494,7 +628,7 @@ class CarousellScraper:
             
             # Extract link
             if product['product_id']:
-                product['link'] = f"https://www.carousell.com.my/p/{product['product_id']}"
+                product['link'] = f"{self.base_url}/p/{product['product_id']}"
             
             # Only return if we have essential info and it's Nike related
             if (product['product_id'] and product['title'] and 
@@ -547,16 +681,19 @@ class CarousellScraper:
     def scrape_with_browser(self):
         """Fallback browser-based scraping."""
         logger.info("Falling back to browser approach...")
+        self.crawl_complete = False
         
         try:
             self.driver = self.create_driver(headless=True)
             
             logger.info("Establishing browser session...")
-            self.driver.get("https://www.carousell.com.my/")
+            self.throttle()
+            self.driver.get(f"{self.base_url}/")
             time.sleep(3)
             
-            logger.info(f"Navigating to: {Config.SEARCH_URL}")
-            self.driver.get(Config.SEARCH_URL)
+            logger.info(f"Navigating to: {self.search_url}")
+            self.throttle()
+            self.driver.get(self.search_url)
             
             max_wait = 30
             waited = 0
@@ -577,11 +714,11 @@ class CarousellScraper:
             
             # Try to scrape
             all_listings = self.scrape_current_page(self.driver)
-            
+
             if not all_listings:
-                all_listings = self.scrape_with_alternative_selectors()
-            
-            return all_listings
+                return self.scrape_with_alternative_selectors()
+
+            return self.paginate_browser(all_listings)
 
         except Exception as e:
             logger.error(f"Browser scraping failed: {e}")
@@ -594,98 +731,107 @@ class CarousellScraper:
                     pass
                 self.driver = None
 
-    def scrape_with_alternative_selectors(self):
-        """Try alternative selectors to find product listings."""
+    def paginate_browser(self, first_page):
+        """Clicks 'Show more results' until the newly loaded cards are mostly already seen."""
+        watermark = self.store.get_watermark(self.SEARCH_QUERY, self.region.code)
+        # Held as compact Listing records; deep pagination can accumulate many pages
+        all_listings = [Listing.from_dict(item) for item in first_page]
+        seen_ids = {listing['product_id'] for listing in first_page}
+        page = first_page
+        pages = 1
+
+        while pages < self.MAX_PAGES and not page_below_watermark(page, watermark, self.STALE_PAGE_RATIO):
+            if not self.go_to_next_page(self.driver):
+                break
+            # The page keeps earlier cards after "Show more results", so only scrape the ones appended below them
+            new_cards = self.scrape_current_page(self.driver, start_index=self.cards_scraped)
+            page = [listing for listing in new_cards if listing['product_id'] not in seen_ids]
+            if not page:
+                break
+            seen_ids.update(listing['product_id'] for listing in page)
+            all_listings.extend(Listing.from_dict(item) for item in page)
+            pages += 1
+
+        self.crawl_complete = page_below_watermark(page, watermark, self.STALE_PAGE_RATIO)
+        logger.info(f"Loaded {pages} page(s) in browser (watermark: {watermark}, complete: {self.crawl_complete})")
+        return all_listings
+
+    def scrape_with_alternative_selectors(self, page_type='search'):
+        """Try alternative selectors to find product listings.
+
+        All selectors are evaluated in one in-page script, and the one that last
+        produced listings for this page type is probed on its own first.
+        """
+        # Markup can differ between marketplaces, so winners are remembered per region
+        page_type = f"{self.region.code}:{page_type}"
+        selectors = [selector.format(currency=self.region.currency) for selector in self.ALTERNATIVE_SELECTORS]
+        preferred = self.store.preferred_selector(page_type)
+        if preferred in selectors:
+            listings_data = self.probe_alternative_selectors(page_type, [preferred])
+            if listings_data:
+                return listings_data
+            logger.info(f"Preferred selector '{preferred}' found no listings, probing all selectors")
+
+        return self.probe_alternative_selectors(page_type, selectors)
+
+    def probe_alternative_selectors(self, page_type, selectors):
+        """Runs selectors in a single execute_script call and keeps the first that yields listings."""
+        try:
+            probes = self.driver.execute_script(SELECTOR_PROBE_SCRIPT, selectors, 5, self.region.currency)
+        except WebDriverException as e:
+            logger.debug(f"Selector probe script failed: {e}")
+            return []
+
         listings_data = []
-        
-        # Try different selectors that might work
-        alternative_selectors = [
-            "//a[contains(@href, '/p/')]",  # Any link to product page
-            "//div[contains(@class, 'listing')]",  # Generic listing class
-            "//*[contains(@data-testid, 'listing')]",  # Any listing testid
-            "//*[contains(@data-testid, 'card')]",  # Any card testid
-            "//div[contains(@class, 'card')]",  # Generic card class
-            "//article",  # Article tags often contain listings
-            "//*[contains(text(), 'RM')]//ancestor::*[3]"  # Find elements containing prices
-        ]
-        
-        for selector in alternative_selectors:
-            try:
-                elements = self.driver.find_elements(By.XPATH, selector)
-                logger.info(f"Selector '{selector}' found {len(elements)} elements")
-                
-                if elements:
-                    # Process first few elements to see if they're product listings
-                    for i, element in enumerate(elements[:5]):
-                        try:
-                            # Look for product indicators
-                            element_text = element.text[:100] if element.text else ""
-                            element_html = element.get_attribute('outerHTML')[:200]
-                            
-                            if any(keyword in element_text.lower() for keyword in ['nike', 'rm', 'shoe']):
-                                logger.info(f"Found potential product element {i}: {element_text}")
-                                # Try to extract basic info
-                                item = self.extract_basic_info(element)
-                                if item and item.get('product_id'):
-                                    listings_data.append(item)
-                                    
-                        except Exception as e:
-                            logger.debug(f"Error processing element {i}: {e}")
-                            continue
-                    
-                    if listings_data:
-                        logger.info(f"Successfully extracted {len(listings_data)} listings with selector: {selector}")
-                        break
-                        
-            except Exception as e:
-                logger.debug(f"Error with selector {selector}: {e}")
-                continue
-        
+        winner = None
+        results = {}
+        for probe in probes:
+            selector = probe['selector']
+            if probe.get('error'):
+                logger.debug(f"Error with selector {selector}: {probe['error']}")
+            logger.info(f"Selector '{selector}' found {probe['count']} elements in {probe['ms']:.1f}ms "
+                        f"(samples read in {probe['sample_ms']:.1f}ms)")
+
+            found = []
+            for i, sample in enumerate(probe['samples']):
+                # Look for product indicators
+                element_text = (sample.get('text') or '')[:100]
+                if any(keyword in element_text.lower() for keyword in ['nike', self.region.currency.lower(), 'shoe']):
+                    logger.info(f"Found potential product element {i}: {element_text}")
+                    item = self.extract_basic_info(sample)
+                    if item:
+                        found.append(item)
+
+            results[selector] = (bool(found), probe['ms'])
+            if found and winner is None:
+                winner = selector
+                listings_data = found
+
+        self.store.record_selector_results(page_type, results, winner)
+        if winner:
+            logger.info(f"Successfully extracted {len(listings_data)} listings with selector: {winner}")
+        for row in self.store.selector_report(page_type):
+            logger.info(f"Selector '{row['selector']}': hit rate {row['hit_rate']:.0%} "
+                        f"over {row['attempts']} probes, avg {row['avg_ms']:.1f}ms")
         return listings_data
     
-    def extract_basic_info(self, element):
-        """Extract basic product info from any element."""
+    def extract_basic_info(self, sample):
+        """Extract basic product info from an element sample returned by the probe script."""
         item = Config.DEFAULT_ITEM_SCHEMA.copy()
         
-        try:
-            # Try to find link
-            link_elem = element.find_element(By.XPATH, ".//a[contains(@href, '/p/')]")
-            href = link_elem.get_attribute('href')
-            if href:
-                item['link'] = href
-                # Extract product ID from URL
-                product_id_match = re.search(r'/p/[^/]+-(\d+)', href)
-                if product_id_match:
-                    item['product_id'] = product_id_match.group(1)
-                else:
-                    item['product_id'] = str(hash(href))[-8:]
-        except:
-            pass
-            
-        # Try to find title
-        try:
-            title_elem = element.find_element(By.XPATH, ".//img[@alt]")
-            item['title'] = title_elem.get_attribute('alt')
-        except:
-            try:
-                title_elem = element.find_element(By.XPATH, ".//*[contains(text(), 'Nike') or contains(text(), 'nike')]")
-                item['title'] = title_elem.text.strip()
-            except:
-                pass
-        
-        # Try to find price
-        try:
-            price_elem = element.find_element(By.XPATH, ".//*[contains(text(), 'RM')]")
-            item['price'] = price_elem.text.strip()
-        except:
-            pass
+        href = sample.get('href')
+        if href:
+            item['link'] = href
+            # Extract product ID from URL
+            product_id_match = re.search(r'/p/[^/]+-(\d+)', href)
+            if product_id_match:
+                item['product_id'] = product_id_match.group(1)
+            else:
+                item['product_id'] = str(hash(href))[-8:]
             
-        # Try to find image
-        try:
-            img_elem = element.find_element(By.XPATH, ".//img[@src]")
-            item['img'] = img_elem.get_attribute('src')
-        except:
-            pass
+        item['title'] = sample.get('alt') or (sample.get('nikeText') or '').strip() or None
+        item['price'] = (sample.get('priceText') or '').strip() or None
+        item['img'] = sample.get('src')
         
         return item if item.get('product_id') else None
     
@@ -699,7 +845,7 @@ class CarousellScraper:
                 ("Elements with 'card'", "//*[contains(@class, 'card') or contains(@data-testid, 'card')]"),
                 ("Elements with 'listing'", "//*[contains(@class, 'listing') or contains(@data-testid, 'listing')]"),
                 ("Elements containing 'Nike'", "//*[contains(text(), 'Nike') or contains(text(), 'nike')]"),
-                ("Elements containing 'RM'", "//*[contains(text(), 'RM')]"),
+                (f"Elements containing '{self.region.currency}'", f"//*[contains(text(), '{self.region.currency}')]"),
                 ("All buttons", "//button"),
                 ("All divs with data-testid", "//div[@data-testid]")
             ]
@@ -725,20 +871,27 @@ class CarousellScraper:
             logger.error(f"Debug function error: {e}")
 
     def try_alternative_approach(self):
-        """Try alternative scraping approaches when main method fails."""
+        """Try alternative scraping approaches when main method fails.
+
+        Returns the listings from the first page that loads, like the other
+        scrape_with_* methods, and leaves processing them to the caller.
+        """
         logger.info("Trying alternative scraping approaches...")
         
         # Approach 1: Try different URL formats
-        alternative_urls = [
-            "https://carousell.com.my/search/nike%20shoes",
-            "https://www.carousell.com.my/search/nike",
-            "https://carousell.com.my/search/nike",
-            "https://www.carousell.com.my/c/18/?query=nike%20shoes"
-        ]
+        # Hosts without a bare (non-www) variant skip those URLs
+        bare_url = self.region.bare_url
+        alternative_urls = [url for url in (
+            bare_url and f"{bare_url}/search/nike%20shoes",
+            f"{self.base_url}/search/nike",
+            bare_url and f"{bare_url}/search/nike",
+            f"{self.base_url}/c/18/?query=nike%20shoes"
+        ) if url]
         
         for url in alternative_urls:
             try:
                 logger.info(f"Trying alternative URL: {url}")
+                self.throttle()
                 self.driver.get(url)
                 time.sleep(5)
                 
@@ -746,56 +899,63 @@ class CarousellScraper:
                     logger.info(f"Success with alternative URL: {url}")
                     listings = self.scrape_current_page(self.driver)
                     if listings:
-                        return self.process_listings(listings)
+                        return listings
                         
             except Exception as e:
                 logger.debug(f"Alternative URL {url} failed: {e}")
                 continue
         
-        # Approach 2: Try mobile version
-        try:
-            logger.info("Trying mobile version...")
-            mobile_url = "https://m.carousell.com.my/search/nike%20shoes"
-            self.driver.get(mobile_url)
-            time.sleep(5)
+        # Approach 2: Try mobile version where the marketplace has one
+        if self.region.mobile_url:
+            try:
+                logger.info("Trying mobile version...")
+                mobile_url = self.region.mobile_url + "/search/nike%20shoes"
+                self.throttle()
+                self.driver.get(mobile_url)
+                time.sleep(5)
             
-            if "Just a moment" not in self.driver.title:
-                logger.info("Success with mobile version")
-                listings = self.scrape_current_page(self.driver)
-                if listings:
-                    return self.process_listings(listings)
+                if "Just a moment" not in self.driver.title:
+                    logger.info("Success with mobile version")
+                    listings = self.scrape_current_page(self.driver)
+                    if listings:
+                        return listings
                     
-        except Exception as e:
-            logger.debug(f"Mobile version failed: {e}")
+            except Exception as e:
+                logger.debug(f"Mobile version failed: {e}")
         
         logger.warning("All alternative approaches failed")
-        return False
+        return []
     
     def process_listings(self, all_listings):
-        """Process found listings and send notifications."""
+        """Save found listings and queue their notifications in the outbox."""
         if not all_listings:
             logger.warning("No listings found")
             return False
 
         new_listings = []
+        queued = 0
         
         for listing in all_listings:
-            if listing.get('product_id') and not self.db.product_exists(listing['product_id']):
-                # New product found
-                self.db.save_product(listing)
+            if listing.get('product_id') and not self.store.product_exists(listing.get('product_id'), self.region.code):
+                if isinstance(listing, Listing):
+                    listing = listing.to_dict()
+                # New product found; the listing and its notification are committed together
+                notify = self.seller_filter.allows(listing)
+                if not self.store.save_listing(listing, notify=notify, region=self.region.code):
+                    continue
                 new_listings.append(listing)
                 logger.info(f"New product found: {listing['title']} - {listing['price']}")
+                if notify:
+                    queued += 1
+                else:
+                    logger.info(f"Skipping notification for filtered seller: {listing.get('seller_url')}")
+
+        self.metrics.increment('listings_seen', len(all_listings))
+        self.metrics.increment('new_listings', len(new_listings))
 
-        # Send Discord notifications for new listings
+        # The delivery worker sends queued notifications to Discord
         if new_listings:
-            for listing in new_listings:
-                success = self.notifier.send_new_listing_notification(listing)
-                if success:
-                    logger.info(f"Discord notification sent for: {listing['title']}")
-                else:
-                    logger.error(f"Failed to send Discord notification for: {listing['title']}")
-            
-            logger.info(f"Sent notifications for {len(new_listings)} new listings")
+            logger.info(f"Queued notifications for {queued} of {len(new_listings)} new listings")
         else:
             logger.info("No new listings found")
         
@@ -808,4 +968,7 @@ class CarousellScraper:
                 self.driver.quit()
             except:
                 pass
-            self.driver = None
\ No newline at end of file
+            self.driver = None
+        if self.delivery_worker:
+            self.delivery_worker.stop(timeout=10)
+        self.store.close()
\ No newline at end of file
@@ -0,0 +1,115 @@
+import time
+import logging
+import threading
+from listing_store import ListingStore, DB_PATH
+
+logger = logging.getLogger(__name__)
+
+
+class DeliveryWorker:
+    """Drains the notification outbox in batches, separately from the scraping loop.
+
+    Delivery is at-least-once: a row is marked delivered only after the notifier
+    reports success, and each row's idempotency key ('listing:<region>:<product_id>')
+    guarantees a listing is queued once no matter how often it is scraped.
+    """
+
+    BATCH_SIZE = 20
+    LEASE_SECONDS = 120
+    POLL_INTERVAL = 2
+    MAX_ATTEMPTS = 8
+    BASE_RETRY_DELAY = 5
+    MAX_RETRY_DELAY = 600
+
+    def __init__(self, notifier, db_path=DB_PATH):
+        self.notifier = notifier
+        self.db_path = db_path
+        self.delivered = 0
+        self.failed_attempts = 0
+        self.busy_seconds = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def retry_delay(self, attempts):
+        return min(self.BASE_RETRY_DELAY * 2 ** attempts, self.MAX_RETRY_DELAY)
+
+    def deliver_batch(self, store):
+        """Sends one batch of due notifications. Returns the number of rows processed."""
+        batch = store.claim_outbox(self.BATCH_SIZE, self.LEASE_SECONDS)
+        if not batch:
+            return 0
+
+        started = time.perf_counter()
+        delivered = 0
+        for row in batch:
+            listing = row['payload']
+            try:
+                success = self.notifier.send_new_listing_notification(listing)
+                error = None if success else "notifier returned False"
+            except Exception as e:
+                success = False
+                error = str(e)
+
+            if success:
+                store.mark_delivered(row['id'])
+                delivered += 1
+                logger.info(f"Discord notification sent for: {listing.get('title')} ({row['idempotency_key']})")
+                continue
+
+            attempts = row['attempts'] + 1
+            self.failed_attempts += 1
+            if attempts >= self.MAX_ATTEMPTS:
+                store.mark_attempt_failed(row['id'], error)
+                logger.error(f"Giving up on notification {row['idempotency_key']} after {attempts} attempts: {error}")
+            else:
+                store.mark_attempt_failed(row['id'], error, retry_at=time.time() + self.retry_delay(row['attempts']))
+                logger.warning(f"Notification {row['idempotency_key']} failed (attempt {attempts}), will retry: {error}")
+
+        elapsed = time.perf_counter() - started
+        self.delivered += delivered
+        self.busy_seconds += elapsed
+        logger.info(f"Delivered {delivered}/{len(batch)} notifications in {elapsed:.2f}s")
+        return len(batch)
+
+    def throughput(self):
+        """Delivered notifications per second of time spent sending."""
+        return self.delivered / self.busy_seconds if self.busy_seconds else 0.0
+
+    def run(self):
+        """Delivers until stopped, sleeping only when the outbox has nothing due."""
+        store = ListingStore(self.db_path)
+        try:
+            while not self._stop.is_set():
+                try:
+                    processed = self.deliver_batch(store)
+                except Exception as e:
+                    logger.error(f"Delivery batch failed: {e}")
+                    processed = 0
+                if processed < self.BATCH_SIZE:
+                    self._stop.wait(self.POLL_INTERVAL)
+        finally:
+            store.close()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name="outbox-delivery", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+if __name__ == "__main__":
+    from discord_notifier import DiscordNotifier
+
+    logging.basicConfig(level=logging.INFO)
+    worker = DeliveryWorker(DiscordNotifier())
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        logger.info(f"Stopped after delivering {worker.delivered} notifications ({worker.throughput():.1f}/s)")
@@ -0,0 +1,115 @@
+import re
+import sys
+
+PRICE_TEXT_PATTERN = re.compile(r"^(\D*?)(\d[\d,]*)$")
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _split_url(url):
+    """Splits a URL into an interned directory prefix and its last path segment."""
+    if not url:
+        return None, url
+    cut = url.rfind('/', 0, len(url) - 1) + 1
+    return sys.intern(url[:cut]), url[cut:]
+
+
+def _format_price(prefix, amount):
+    return f"{prefix}{amount:,}"
+
+
+class Listing:
+    """Compact in-memory listing record.
+
+    Low-cardinality strings (condition, size, seller, time posted, currency and
+    URL prefixes) are interned so every listing shares one copy, and price and
+    likes are kept as ints when the original text can be rebuilt from them. to_dict()/from_dict() convert to and from the
+    DEFAULT_ITEM_SCHEMA dicts used by the store and the notifier.
+    """
+
+    __slots__ = ('product_id', 'title', 'link_prefix', 'link_tail', 'img_prefix', 'img_tail',
+                 'price', 'currency', 'price_text', 'seller_name', 'seller_url', 'time_posted',
+                 'condition', 'size', 'likes')
+
+    # Fields readable as attributes (stored as-is, or rebuilt by a property)
+    PLAIN_FIELDS = frozenset(('product_id', 'title', 'link', 'img', 'seller_name', 'seller_url',
+                              'time_posted', 'condition', 'size'))
+
+    @classmethod
+    def from_dict(cls, item):
+        listing = cls.__new__(cls)
+        listing.product_id = item.get('product_id')
+        listing.title = item.get('title')
+        listing.link_prefix, listing.link_tail = _split_url(item.get('link'))
+        listing.img_prefix, listing.img_tail = _split_url(item.get('img'))
+        listing.seller_name = _intern(item.get('seller_name'))
+        listing.seller_url = _intern(item.get('seller_url'))
+        listing.time_posted = _intern(item.get('time_posted'))
+        listing.condition = _intern(item.get('condition'))
+        listing.size = _intern(item.get('size'))
+
+        price = item.get('price')
+        listing.price = listing.currency = listing.price_text = None
+        match = PRICE_TEXT_PATTERN.match(price.strip()) if isinstance(price, str) else None
+        if match:
+            listing.currency = sys.intern(match.group(1))
+            listing.price = int(match.group(2).replace(',', ''))
+            # Only keep the original text when it can't be rebuilt from the parsed parts
+            if _format_price(listing.currency, listing.price) != price:
+                listing.price_text = price
+        else:
+            listing.price_text = price
+
+        likes = item.get('likes')
+        # '03' or non-ASCII digits would not survive the round trip, so those stay strings
+        if isinstance(likes, str) and likes.isdecimal() and str(int(likes)) == likes:
+            listing.likes = int(likes)
+        else:
+            listing.likes = _intern(likes)
+        return listing
+
+    @property
+    def link(self):
+        return self.link_prefix + self.link_tail if self.link_prefix is not None else self.link_tail
+
+    @property
+    def img(self):
+        return self.img_prefix + self.img_tail if self.img_prefix is not None else self.img_tail
+
+    def price_display(self):
+        if self.price_text is not None or self.price is None:
+            return self.price_text
+        return _format_price(self.currency, self.price)
+
+    def likes_display(self):
+        return str(self.likes) if isinstance(self.likes, int) else self.likes
+
+    def to_dict(self):
+        return {
+            'product_id': self.product_id,
+            'title': self.title,
+            'link': self.link,
+            'img': self.img,
+            'price': self.price_display(),
+            'seller_name': self.seller_name,
+            'seller_url': self.seller_url,
+            'time_posted': self.time_posted,
+            'condition': self.condition,
+            'size': self.size,
+            'likes': self.likes_display(),
+        }
+
+    def get(self, field, default=None):
+        """dict.get() equivalent, so code reading listing dicts also accepts Listing."""
+        if field in self.PLAIN_FIELDS:
+            return getattr(self, field)
+        if field == 'price':
+            return self.price_display()
+        if field == 'likes':
+            return self.likes_display()
+        return default
+
+    def __repr__(self):
+        return f"Listing(product_id={self.product_id!r}, title={self.title!r}, price={self.price_display()!r})"
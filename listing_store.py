@@ -0,0 +1,431 @@
+import re
+import sys
+import json
+import time
+import sqlite3
+import logging
+from sellers import canonical_seller_slug, canonical_seller_url
+from regions import DEFAULT_REGION
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = "products.db"
+
+LISTING_COLUMNS = ('product_id', 'title', 'link', 'img', 'price', 'seller_name',
+                   'seller_url', 'time_posted', 'condition', 'size', 'likes')
+
+PRICE_PATTERN = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+
+def parse_price(price):
+    """Parses a display price such as 'RM1,200' or 'RM 75.50' into a float."""
+    if not price:
+        return None
+    match = PRICE_PATTERN.search(str(price))
+    if not match:
+        return None
+    try:
+        return float(match.group(0).replace(',', ''))
+    except ValueError:
+        return None
+
+
+def utc_now():
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+
+
+def numeric_product_id(listing):
+    """Returns a listing's product_id as an int, or None for non-numeric ids."""
+    product_id = listing.get('product_id')
+    if product_id is None or not str(product_id).isdigit():
+        return None
+    return int(product_id)
+
+
+def page_below_watermark(listings, watermark, stale_ratio):
+    """True when at least stale_ratio of a page's listings are at or below the watermark.
+
+    The ratio leaves room for bumped and promoted listings, which carry old ids
+    but can still appear among new ones on a 'recent' sort.
+    """
+    if watermark is None:
+        return False
+    product_ids = [pid for pid in (numeric_product_id(l) for l in listings) if pid is not None]
+    if not product_ids:
+        return False
+    seen = sum(1 for pid in product_ids if pid <= watermark)
+    return seen >= stale_ratio * len(product_ids)
+
+
+LISTINGS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS {name} (
+        region TEXT NOT NULL DEFAULT '{default_region}',
+        product_id TEXT,
+        title TEXT,
+        link TEXT,
+        img TEXT,
+        price TEXT,
+        seller_name TEXT,
+        seller_url TEXT,
+        time_posted TEXT,
+        condition TEXT,
+        size TEXT,
+        likes TEXT,
+        seller_slug TEXT,
+        price_value REAL,
+        UNIQUE (region, product_id),
+        FOREIGN KEY (region, seller_slug) REFERENCES sellers(region, seller_slug)
+    )
+'''
+
+SELLERS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS {name} (
+        region TEXT NOT NULL DEFAULT '{default_region}',
+        seller_slug TEXT NOT NULL,
+        seller_name TEXT,
+        seller_url TEXT,
+        listing_count INTEGER NOT NULL DEFAULT 0,
+        priced_count INTEGER NOT NULL DEFAULT 0,
+        median_price REAL,
+        first_seen TEXT,
+        last_seen TEXT,
+        PRIMARY KEY (region, seller_slug)
+    )
+'''
+
+WATERMARKS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS {name} (
+        region TEXT NOT NULL DEFAULT '{default_region}',
+        query TEXT NOT NULL,
+        product_id INTEGER NOT NULL,
+        seen_at TEXT NOT NULL,
+        PRIMARY KEY (region, query)
+    )
+'''
+
+
+class ListingStore:
+    """SQLite access for listings, sellers, crawl state and the notification outbox."""
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        # WAL lets the delivery worker drain the outbox while the scraper writes
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.create_tables()
+
+    def create_tables(self):
+        with self.conn:
+            self.conn.execute(LISTINGS_TABLE.format(name='listings', default_region=DEFAULT_REGION))
+            self.conn.execute(SELLERS_TABLE.format(name='sellers', default_region=DEFAULT_REGION))
+            self.conn.execute(WATERMARKS_TABLE.format(name='watermarks', default_region=DEFAULT_REGION))
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    idempotency_key TEXT NOT NULL UNIQUE,
+                    product_id TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    created_at REAL NOT NULL,
+                    next_attempt_at REAL NOT NULL,
+                    delivered_at REAL
+                )
+            ''')
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS selector_stats (
+                    page_type TEXT NOT NULL,
+                    selector TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    total_ms REAL NOT NULL DEFAULT 0,
+                    last_win_at TEXT,
+                    PRIMARY KEY (page_type, selector)
+                )
+            ''')
+
+            # Databases from before multi-region support are keyed by product_id or
+            # seller_slug alone; rebuild those tables keyed by region, rows becoming MY
+            for name, table_sql in (('listings', LISTINGS_TABLE), ('sellers', SELLERS_TABLE),
+                                    ('watermarks', WATERMARKS_TABLE)):
+                if 'region' not in self._columns(name):
+                    self._rebuild_table(name, table_sql)
+            if 'region' not in self._columns('outbox'):
+                self.conn.execute(f"ALTER TABLE outbox ADD COLUMN region TEXT NOT NULL DEFAULT '{DEFAULT_REGION}'")
+
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_listings_seller_price ON listings(region, seller_slug, price_value)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_outbox_pending ON outbox(status, next_attempt_at)")
+
+    def _columns(self, table):
+        return [row['name'] for row in self.conn.execute(f"PRAGMA table_info({table})")]
+
+    def _rebuild_table(self, name, table_sql):
+        old_columns = set(self._columns(name))
+        self.conn.execute(table_sql.format(name=f"{name}_regional", default_region=DEFAULT_REGION))
+        shared = [column for column in self._columns(f"{name}_regional") if column in old_columns]
+        self.conn.execute(
+            f"INSERT INTO {name}_regional ({', '.join(shared)}) SELECT {', '.join(shared)} FROM {name}"
+        )
+        self.conn.execute(f"DROP TABLE {name}")
+        self.conn.execute(f"ALTER TABLE {name}_regional RENAME TO {name}")
+        logger.info(f"Rebuilt {name} table keyed by region")
+
+    def product_exists(self, product_id, region=DEFAULT_REGION):
+        row = self.conn.execute(
+            "SELECT 1 FROM listings WHERE region = ? AND product_id = ?", (region, product_id)
+        ).fetchone()
+        return row is not None
+
+    def save_listing(self, listing, notify=True, region=DEFAULT_REGION):
+        """Saves a new listing, its seller aggregates and its outbox notification in one transaction.
+
+        Returns False if the listing was already stored, in which case nothing is queued.
+        """
+        with self.conn:
+            cursor = self.conn.execute(
+                f"INSERT OR IGNORE INTO listings (region, {', '.join(LISTING_COLUMNS)}) "
+                f"VALUES (?, {', '.join('?' for _ in LISTING_COLUMNS)})",
+                (region,) + tuple(listing.get(column) for column in LISTING_COLUMNS)
+            )
+            if cursor.rowcount == 0:
+                return False
+            self._record_seller(listing, region)
+            if notify:
+                now = time.time()
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO outbox (idempotency_key, region, product_id, payload, created_at, next_attempt_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (f"listing:{region}:{listing['product_id']}", region, listing['product_id'],
+                     json.dumps(listing), now, now)
+                )
+        return True
+
+    def _record_seller(self, listing, region):
+        """Links a saved listing to its seller and updates that seller's aggregates.
+
+        Only the first call per listing counts it. Returns the seller slug, or
+        None if the listing has no recognizable seller.
+        """
+        slug = canonical_seller_slug(listing.get('seller_url'))
+        if slug is None:
+            return None
+
+        price_value = parse_price(listing.get('price'))
+        seen_at = utc_now()
+        cursor = self.conn.execute(
+            "UPDATE listings SET seller_slug = ?, seller_url = ?, price_value = ? "
+            "WHERE region = ? AND product_id = ? AND seller_slug IS NULL",
+            (slug, canonical_seller_url(listing.get('seller_url')), price_value, region, listing.get('product_id'))
+        )
+        if cursor.rowcount == 0:
+            return slug
+
+        self.conn.execute('''
+            INSERT INTO sellers (region, seller_slug, seller_name, seller_url, listing_count, priced_count, first_seen, last_seen)
+            VALUES (?, ?, ?, ?, 1, ?, ?, ?)
+            ON CONFLICT(region, seller_slug) DO UPDATE SET
+                seller_name = COALESCE(excluded.seller_name, seller_name),
+                listing_count = listing_count + 1,
+                priced_count = priced_count + excluded.priced_count,
+                last_seen = excluded.last_seen
+        ''', (region, slug, listing.get('seller_name'), canonical_seller_url(listing.get('seller_url')),
+              1 if price_value is not None else 0, seen_at, seen_at))
+
+        if price_value is not None:
+            self._refresh_median(slug, region)
+        return slug
+
+    def _refresh_median(self, slug, region):
+        """Recomputes one seller's median price through the (region, seller_slug, price_value) index."""
+        row = self.conn.execute(
+            "SELECT priced_count FROM sellers WHERE region = ? AND seller_slug = ?", (region, slug)
+        ).fetchone()
+        count = row['priced_count'] if row else 0
+        median = None
+        if count:
+            values = [r['price_value'] for r in self.conn.execute(
+                "SELECT price_value FROM listings WHERE region = ? AND seller_slug = ? AND price_value IS NOT NULL "
+                "ORDER BY price_value LIMIT ? OFFSET ?",
+                (region, slug, 2 - count % 2, (count - 1) // 2)
+            )]
+            if values:
+                median = sum(values) / len(values)
+        self.conn.execute(
+            "UPDATE sellers SET median_price = ? WHERE region = ? AND seller_slug = ?", (median, region, slug)
+        )
+
+    def get_seller(self, slug, region=DEFAULT_REGION):
+        row = self.conn.execute(
+            "SELECT * FROM sellers WHERE region = ? AND seller_slug = ?", (region, slug)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def get_watermark(self, query, region=DEFAULT_REGION):
+        """Returns the newest product_id seen for a search query, or None before the first crawl."""
+        row = self.conn.execute(
+            "SELECT product_id FROM watermarks WHERE region = ? AND query = ?", (region, query)
+        ).fetchone()
+        return row['product_id'] if row else None
+
+    def advance_watermark(self, query, listings, region=DEFAULT_REGION, complete=True):
+        """Raises the query's high-water mark to the newest numeric product_id in listings.
+
+        complete says whether the crawl paged down to the current mark. When it
+        stopped early, the listings between its last page and the mark were
+        never fetched, so the mark stays put and the next crawl pages down to
+        it again. A query's first mark is set either way.
+
+        seen_at records when the mark last moved, so it is left alone when
+        nothing newer than the current mark was seen.
+        """
+        product_ids = [pid for pid in (numeric_product_id(l) for l in listings) if pid is not None]
+        watermark = self.get_watermark(query, region)
+        if not product_ids:
+            return watermark
+        if not complete and watermark is not None:
+            logger.info(f"Crawl of '{query}' ({region}) stopped before reaching watermark {watermark}, keeping it")
+            return watermark
+        with self.conn:
+            self.conn.execute('''
+                INSERT INTO watermarks (region, query, product_id, seen_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(region, query) DO UPDATE SET
+                    product_id = excluded.product_id,
+                    seen_at = excluded.seen_at
+                WHERE excluded.product_id > product_id
+            ''', (region, query, max(product_ids), utc_now()))
+        return self.get_watermark(query, region)
+
+    def claim_outbox(self, batch_size, lease_seconds):
+        """Claims up to batch_size due notifications, oldest first.
+
+        Claimed rows are pushed lease_seconds into the future, so rows held by a
+        worker that dies mid-batch become due again instead of being lost.
+        """
+        now = time.time()
+        with self.conn:
+            # Take the write lock up front so concurrent workers never claim the same rows
+            self.conn.execute("BEGIN IMMEDIATE")
+            rows = self.conn.execute(
+                "SELECT id, idempotency_key, payload, attempts FROM outbox "
+                "WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY id LIMIT ?",
+                (now, batch_size)
+            ).fetchall()
+            self.conn.executemany(
+                "UPDATE outbox SET next_attempt_at = ? WHERE id = ?",
+                [(now + lease_seconds, row['id']) for row in rows]
+            )
+        return [dict(row, payload=json.loads(row['payload'])) for row in rows]
+
+    def mark_delivered(self, outbox_id):
+        with self.conn:
+            self.conn.execute(
+                "UPDATE outbox SET status = 'delivered', delivered_at = ?, attempts = attempts + 1 WHERE id = ?",
+                (time.time(), outbox_id)
+            )
+
+    def mark_attempt_failed(self, outbox_id, error, retry_at=None):
+        """Records a failed delivery; the row stays pending until retry_at, or is failed for good without one."""
+        with self.conn:
+            if retry_at is None:
+                self.conn.execute(
+                    "UPDATE outbox SET status = 'failed', attempts = attempts + 1, last_error = ? WHERE id = ?",
+                    (error, outbox_id)
+                )
+            else:
+                self.conn.execute(
+                    "UPDATE outbox SET attempts = attempts + 1, last_error = ?, next_attempt_at = ? WHERE id = ?",
+                    (error, retry_at, outbox_id)
+                )
+
+    def outbox_counts(self):
+        return {row['status']: row['count'] for row in self.conn.execute(
+            "SELECT status, COUNT(*) AS count FROM outbox GROUP BY status"
+        )}
+
+    def preferred_selector(self, page_type):
+        """Returns the selector that most recently produced listings for a page type."""
+        row = self.conn.execute(
+            "SELECT selector FROM selector_stats WHERE page_type = ? AND last_win_at IS NOT NULL "
+            "ORDER BY last_win_at DESC LIMIT 1",
+            (page_type,)
+        ).fetchone()
+        return row['selector'] if row else None
+
+    def record_selector_results(self, page_type, results, winner=None):
+        """Adds one probe's outcome per selector; results maps selector -> (hit, cost_ms)."""
+        with self.conn:
+            self.conn.executemany('''
+                INSERT INTO selector_stats (page_type, selector, attempts, hits, total_ms)
+                VALUES (?, ?, 1, ?, ?)
+                ON CONFLICT(page_type, selector) DO UPDATE SET
+                    attempts = attempts + 1,
+                    hits = hits + excluded.hits,
+                    total_ms = total_ms + excluded.total_ms
+            ''', [(page_type, selector, 1 if hit else 0, cost_ms) for selector, (hit, cost_ms) in results.items()])
+            if winner is not None:
+                self.conn.execute(
+                    "UPDATE selector_stats SET last_win_at = ? WHERE page_type = ? AND selector = ?",
+                    (utc_now(), page_type, winner)
+                )
+
+    def selector_report(self, page_type):
+        return [dict(row) for row in self.conn.execute(
+            "SELECT selector, attempts, hits, 1.0 * hits / attempts AS hit_rate, total_ms / attempts AS avg_ms "
+            "FROM selector_stats WHERE page_type = ? ORDER BY hit_rate DESC, avg_ms",
+            (page_type,)
+        )]
+
+    def backfill_sellers(self):
+        """Canonicalizes seller URLs on existing rows and rebuilds seller counts and medians from them.
+
+        Sellers already in the table keep their first_seen/last_seen. Sellers
+        found only in rows saved before the sellers table existed have no
+        seen-time, so theirs are set to the time of the backfill.
+        """
+        rows = self.conn.execute("SELECT rowid, seller_url, price FROM listings").fetchall()
+        seen_at = utc_now()
+        updated = 0
+        with self.conn:
+            for row in rows:
+                slug = canonical_seller_slug(row['seller_url'])
+                self.conn.execute(
+                    "UPDATE listings SET seller_slug = ?, seller_url = ?, price_value = ? WHERE rowid = ?",
+                    (slug, canonical_seller_url(row['seller_url']), parse_price(row['price']), row['rowid'])
+                )
+                updated += 1
+
+            self.conn.execute('''
+                INSERT INTO sellers (region, seller_slug, seller_name, seller_url, listing_count, priced_count, first_seen, last_seen)
+                SELECT region, seller_slug, MAX(seller_name), MAX(seller_url), COUNT(*), COUNT(price_value), ?, ?
+                FROM listings
+                WHERE seller_slug IS NOT NULL
+                GROUP BY region, seller_slug
+                ON CONFLICT(region, seller_slug) DO UPDATE SET
+                    seller_name = COALESCE(excluded.seller_name, seller_name),
+                    seller_url = excluded.seller_url,
+                    listing_count = excluded.listing_count,
+                    priced_count = excluded.priced_count
+            ''', (seen_at, seen_at))
+            self.conn.execute(
+                "DELETE FROM sellers WHERE NOT EXISTS (SELECT 1 FROM listings "
+                "WHERE listings.region = sellers.region AND listings.seller_slug = sellers.seller_slug)"
+            )
+            for row in self.conn.execute("SELECT region, seller_slug FROM sellers").fetchall():
+                self._refresh_median(row['seller_slug'], row['region'])
+
+        logger.info(f"Backfilled {updated} listings into the sellers table")
+        return updated
+
+    def close(self):
+        self.conn.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    store = ListingStore(sys.argv[1] if len(sys.argv) > 1 else DB_PATH)
+    try:
+        store.backfill_sellers()
+    finally:
+        store.close()
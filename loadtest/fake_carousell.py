@@ -0,0 +1,200 @@
+import html
+import time
+import random
+import asyncio
+import logging
+import urllib.parse
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+MODELS = [
+    "Nike Air Force 1 '07 Low", "Nike Dunk Low Panda", "Nike Air Max 90", "Nike Air Jordan 1 Mid",
+    "Nike Pegasus 40", "Nike Revolution 6", "Nike Downshifter 12", "Nike Blazer Mid '77",
+]
+CONDITIONS = ["Brand new", "Like new", "Lightly used", "Well used", "Buyer Protection"]
+SIZES = ["UK 7", "UK 8", "US 9", "US 10", "EU 42"]
+
+CHALLENGE_PAGE = (
+    "<html><head><title>Just a moment...</title></head>"
+    "<body><p>Checking if the site connection is secure</p></body></html>"
+)
+
+
+class FakeCarousell:
+    """Stand-in Carousell search backend with a growing, newest-first inventory.
+
+    Serves the JSON search API, the HTML search page with 'listing-card-' cards
+    and a 'Show more results' button, and a Cloudflare-style "Just a moment"
+    interstitial on a configurable share of requests.
+    """
+
+    def __init__(self, initial_listings=500, new_per_minute=60, promoted=2, challenge_rate=0.0,
+                 page_size=20, seller_count=200, seed=None):
+        self.random = random.Random(seed)
+        self.new_per_minute = new_per_minute
+        self.promoted = promoted
+        self.challenge_rate = challenge_rate
+        self.page_size = page_size
+        self.sellers = [f"seller{n:04d}" for n in range(seller_count)]
+        self.next_id = 1388900000
+        self.listings = []
+        self.requests_served = 0
+        self.challenges_served = 0
+        for _ in range(initial_listings):
+            self.add_listing(created_at=time.time() - self.random.uniform(600, 86400))
+
+    def add_listing(self, created_at=None):
+        self.next_id += self.random.randint(1, 50)
+        model = self.random.choice(MODELS)
+        listing = {
+            'id': self.next_id,
+            'title': f"{model} {self.random.choice(SIZES)}",
+            'price': self.random.randrange(30, 900, 5),
+            'seller': self.random.choice(self.sellers),
+            'condition': self.random.choice(CONDITIONS),
+            'size': self.random.choice(SIZES),
+            'likes': self.random.randint(0, 12),
+            'created_at': created_at or time.time(),
+        }
+        # Newest first, matching sort_by=recent
+        self.listings.insert(0, listing)
+        return listing
+
+    async def grow_inventory(self, app):
+        """Adds new listings at new_per_minute for as long as the server runs."""
+        try:
+            while True:
+                await asyncio.sleep(60 / self.new_per_minute if self.new_per_minute else 3600)
+                if self.new_per_minute:
+                    self.add_listing()
+        except asyncio.CancelledError:
+            pass
+
+    def page(self, offset, limit):
+        results = self.listings[offset:offset + limit]
+        if offset == 0 and self.promoted and len(self.listings) > limit + self.promoted:
+            # Promoted listings are older items pinned above the recent results, on top of a full page
+            results = self.random.sample(self.listings[limit:], self.promoted) + results
+        return results
+
+    def challenged(self):
+        self.requests_served += 1
+        if self.random.random() < self.challenge_rate:
+            self.challenges_served += 1
+            return True
+        return False
+
+    @staticmethod
+    def slug(listing):
+        return '-'.join(listing['title'].lower().replace("'", '').split())
+
+    def to_json(self, listing):
+        return {
+            'id': str(listing['id']),
+            'title': listing['title'],
+            'price': {'amount': str(listing['price']), 'currency': 'MYR'},
+            'photos': [{'url': f"https://media.example.test/{listing['id']}.jpg"}],
+            'seller': {'username': listing['seller']},
+            'condition': listing['condition'],
+            'likes_count': listing['likes'],
+        }
+
+    def to_card(self, listing):
+        title = html.escape(listing['title'], quote=True)
+        minutes = max(1, int((time.time() - listing['created_at']) / 60))
+        return f'''
+<div data-testid="listing-card-{listing['id']}">
+  <a class="D_ls" href="/u/{listing['seller']}/?t-id=fake_{listing['id']}&amp;t-source=search_results">
+    <p data-testid="listing-card-text-seller-name">{listing['seller']}</p>
+    <div class="D_rw"><div class="D_aLG"><p>{minutes} minutes ago</p></div></div>
+  </a>
+  <a class="D_ls" href="/p/{self.slug(listing)}-{listing['id']}/?t-id=fake_{listing['id']}">
+    <img class="D_mm" src="https://media.example.test/{listing['id']}.jpg" alt="{title}">
+    <p class="D_lI">{title}</p>
+    <p title="RM{listing['price']}">RM{listing['price']}</p>
+    <p class="D_lz">{listing['condition']}</p>
+    <p class="D_lz">Size: {listing['size']}</p>
+  </a>
+  <button data-testid="listing-card-btn-like"><span class="D_lz">{listing['likes']}</span></button>
+</div>'''
+
+    async def search_api(self, request):
+        if self.challenged():
+            return web.Response(text=CHALLENGE_PAGE, status=403, content_type='text/html')
+        if request.method == 'POST':
+            params = await request.json()
+        else:
+            params = request.query
+        offset = int(params.get('offset', 0))
+        limit = int(params.get('limit', self.page_size))
+        listings = [self.to_json(listing) for listing in self.page(offset, limit)]
+        return web.json_response({'data': {'listings': listings, 'offset': offset, 'total': len(self.listings)}})
+
+    async def search_page(self, request):
+        if self.challenged():
+            return web.Response(text=CHALLENGE_PAGE, status=403, content_type='text/html')
+        query = request.match_info.get('query', 'nike shoes')
+        cards = ''.join(self.to_card(listing) for listing in self.page(0, self.page_size))
+        more_url = f"/search-fragment?q={urllib.parse.quote(query)}"
+        body = f'''<html><head><title>{html.escape(query)} | Carousell Malaysia</title></head>
+<body>
+<div id="results">{cards}</div>
+<button id="show-more" type="button">Show more results</button>
+<script>
+let offset = {self.page_size};
+document.getElementById('show-more').addEventListener('click', async () => {{
+  const response = await fetch('{more_url}&offset=' + offset);
+  const cards = await response.text();
+  document.getElementById('results').insertAdjacentHTML('beforeend', cards);
+  offset += {self.page_size};
+  if (!cards.trim()) document.getElementById('show-more').remove();
+}});
+</script>
+</body></html>'''
+        return web.Response(text=body, content_type='text/html')
+
+    async def search_fragment(self, request):
+        offset = int(request.query.get('offset', 0))
+        cards = ''.join(self.to_card(listing) for listing in self.page(offset, self.page_size))
+        return web.Response(text=cards, content_type='text/html')
+
+    async def home(self, request):
+        return web.Response(text="<html><head><title>Carousell Malaysia</title></head><body></body></html>",
+                            content_type='text/html')
+
+    async def stats(self, request):
+        """Creation time per listing id, used to measure listing-to-notification latency."""
+        return web.json_response({
+            'listings': {str(listing['id']): listing['created_at'] for listing in self.listings},
+            'requests_served': self.requests_served,
+            'challenges_served': self.challenges_served,
+        })
+
+    def make_app(self):
+        app = web.Application()
+        app.router.add_get('/', self.home)
+        app.router.add_route('*', '/api-service/web/listings/search/', self.search_api)
+        app.router.add_get('/search/{query}', self.search_page)
+        app.router.add_get('/search-fragment', self.search_fragment)
+        app.router.add_get('/_stats', self.stats)
+
+        async def start_growth(app):
+            app['growth'] = asyncio.create_task(self.grow_inventory(app))
+
+        async def stop_growth(app):
+            app['growth'].cancel()
+            await app['growth']
+
+        app.on_startup.append(start_growth)
+        app.on_cleanup.append(stop_growth)
+        return app
+
+
+def serve(port, **options):
+    web.run_app(FakeCarousell(**options).make_app(), host='127.0.0.1', port=port, print=None)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    serve(8081)
@@ -0,0 +1,104 @@
+import re
+import time
+import logging
+from collections import deque
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+PRODUCT_ID_PATTERN = re.compile(r"/p/(?:[^/]*-)?(\d+)")
+
+
+class FakeDiscord:
+    """Stand-in Discord webhook endpoint with per-webhook and global rate limits.
+
+    Mirrors Discord's webhook behaviour closely enough for load tests: a sliding
+    window of `bucket_limit` requests per `bucket_window` seconds per webhook,
+    a global limit per second, X-RateLimit-* headers, and 429 responses with
+    a JSON retry_after.
+    """
+
+    def __init__(self, bucket_limit=5, bucket_window=2.0, global_limit=50):
+        self.bucket_limit = bucket_limit
+        self.bucket_window = bucket_window
+        self.global_limit = global_limit
+        self.buckets = {}
+        self.global_bucket = deque()
+        self.received = {}
+        self.accepted = 0
+        self.rate_limited = 0
+
+    @staticmethod
+    def _trim(bucket, now, window):
+        while bucket and now - bucket[0] >= window:
+            bucket.popleft()
+
+    def _rate_limited(self, bucket, now, message, is_global):
+        self.rate_limited += 1
+        window = 1.0 if is_global else self.bucket_window
+        retry_after = max(round(window - (now - bucket[0]), 3), 0.001)
+        headers = {
+            'Retry-After': str(retry_after),
+            'X-RateLimit-Limit': str(self.global_limit if is_global else self.bucket_limit),
+            'X-RateLimit-Remaining': '0',
+            'X-RateLimit-Reset-After': str(retry_after),
+        }
+        if is_global:
+            headers['X-RateLimit-Global'] = 'true'
+        return web.json_response(
+            {'message': message, 'retry_after': retry_after, 'global': is_global},
+            status=429, headers=headers
+        )
+
+    async def execute_webhook(self, request):
+        now = time.time()
+        self._trim(self.global_bucket, now, 1.0)
+        if len(self.global_bucket) >= self.global_limit:
+            return self._rate_limited(self.global_bucket, now, "You are being rate limited.", True)
+
+        webhook = request.match_info['webhook_id']
+        bucket = self.buckets.setdefault(webhook, deque())
+        self._trim(bucket, now, self.bucket_window)
+        if len(bucket) >= self.bucket_limit:
+            return self._rate_limited(bucket, now, "You are being rate limited.", False)
+
+        bucket.append(now)
+        self.global_bucket.append(now)
+        payload = await request.json()
+        for embed in payload.get('embeds', []):
+            match = PRODUCT_ID_PATTERN.search(embed.get('url') or '')
+            if match:
+                self.received.setdefault(match.group(1), now)
+        self.accepted += 1
+
+        headers = {
+            'X-RateLimit-Limit': str(self.bucket_limit),
+            'X-RateLimit-Remaining': str(self.bucket_limit - len(bucket)),
+            'X-RateLimit-Reset-After': str(round(self.bucket_window - (now - bucket[0]), 3)),
+        }
+        if request.query.get('wait') == 'true':
+            return web.json_response({'id': str(self.accepted)}, headers=headers)
+        return web.Response(status=204, headers=headers)
+
+    async def stats(self, request):
+        """Receive time per product id, plus accepted and rate-limited counts."""
+        return web.json_response({
+            'received': self.received,
+            'accepted': self.accepted,
+            'rate_limited': self.rate_limited,
+        })
+
+    def make_app(self):
+        app = web.Application()
+        app.router.add_post('/api/webhooks/{webhook_id}/{token}', self.execute_webhook)
+        app.router.add_get('/_stats', self.stats)
+        return app
+
+
+def serve(port, **options):
+    web.run_app(FakeDiscord(**options).make_app(), host='127.0.0.1', port=port, print=None)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    serve(8082)
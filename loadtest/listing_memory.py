@@ -0,0 +1,86 @@
+"""Memory benchmark: schema dicts versus compact Listing records.
+
+Run from the repository root:
+
+    python -m loadtest.listing_memory --count 100000
+"""
+import gc
+import json
+import time
+import random
+import argparse
+import tracemalloc
+from listing import Listing
+from loadtest.fake_carousell import MODELS, CONDITIONS, SIZES
+
+
+def fresh(text):
+    """Returns an equal but distinct string, as each WebDriver .text/get_attribute call does."""
+    return (text + '.')[:-1]
+
+
+def make_item(rng, index, sellers):
+    product_id = str(1388900000 + index)
+    title = f"{rng.choice(MODELS)} {rng.choice(SIZES)} #{index}"
+    slug = '-'.join(title.lower().replace("'", '').replace('#', '').split())
+    seller = rng.choice(sellers)
+    return {
+        'product_id': product_id,
+        'title': title,
+        'link': f"https://www.carousell.com.my/p/{slug}-{product_id}/",
+        'img': f"https://media.karousell.com/media/photos/products/2025/8/{rng.randint(1, 28)}/"
+               f"{slug.replace('-', '_')[:30]}_{product_id}_progressive_thumbnail.jpg",
+        'price': f"RM{rng.randrange(30, 900, 5)}",
+        'seller_name': fresh(seller),
+        'seller_url': f"https://www.carousell.com.my/u/{seller}/",
+        'time_posted': f"{rng.randint(1, 23)} hours ago",
+        'condition': fresh(rng.choice(CONDITIONS)),
+        'size': fresh(rng.choice(SIZES)),
+        'likes': str(rng.randint(0, 12)),
+    }
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    records = build()
+    elapsed = time.perf_counter() - started
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return records, allocated, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=100000)
+    parser.add_argument('--sellers', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    sellers = [f"seller{n:05d}" for n in range(args.sellers)]
+
+    rng = random.Random(args.seed)
+    dicts, dict_bytes, dict_seconds = measure(lambda: [make_item(rng, i, sellers) for i in range(args.count)])
+    del dicts
+
+    rng = random.Random(args.seed)
+    listings, listing_bytes, listing_seconds = measure(
+        lambda: [Listing.from_dict(make_item(rng, i, sellers)) for i in range(args.count)]
+    )
+    del listings
+
+    print(json.dumps({
+        'count': args.count,
+        'dict_mb': round(dict_bytes / 2 ** 20, 1),
+        'listing_mb': round(listing_bytes / 2 ** 20, 1),
+        'dict_bytes_per_listing': round(dict_bytes / args.count),
+        'listing_bytes_per_listing': round(listing_bytes / args.count),
+        'reduction_percent': round(100 * (1 - listing_bytes / dict_bytes), 1),
+        'dict_build_seconds': round(dict_seconds, 2),
+        'listing_build_seconds': round(listing_seconds, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
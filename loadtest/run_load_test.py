@@ -0,0 +1,223 @@
+"""End-to-end load test of CarousellScraper against local Carousell and Discord stand-ins.
+
+Run from the repository root:
+
+    python -m loadtest.run_load_test --duration 300 --new-per-minute 120
+
+Starts the fake servers in child processes, so the CPU and memory figures
+cover only the scraper and its delivery worker.
+"""
+import os
+import time
+import json
+import socket
+import logging
+import argparse
+import resource
+import tempfile
+import multiprocessing
+import requests
+from CarousellDiscordRequests import CarousellScraper
+from loadtest import fake_carousell, fake_discord
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookNotifier:
+    """Minimal webhook notifier pointed at the fake Discord, honouring 429 retry_after."""
+
+    def __init__(self, webhook_url, max_tries=3):
+        self.webhook_url = webhook_url
+        self.max_tries = max_tries
+
+    def send_new_listing_notification(self, listing):
+        payload = {'embeds': [{
+            'title': listing.get('title'),
+            'url': listing.get('link'),
+            'description': f"{listing.get('price')} | {listing.get('seller_name') or 'Unknown seller'}",
+        }]}
+        for _ in range(self.max_tries):
+            response = requests.post(self.webhook_url, json=payload, timeout=10)
+            if response.status_code in (200, 204):
+                return True
+            if response.status_code != 429:
+                return False
+            time.sleep(float(response.json().get('retry_after', 1)))
+        return False
+
+
+def wait_for_port(port, timeout=15):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Fake server on port {port} did not start within {timeout}s")
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def summarize(values):
+    summary = {f"p{pct}": percentile(values, pct) for pct in (50, 90, 99)}
+    summary['count'] = len(values)
+    return summary
+
+
+def run_cycle(scraper, browser):
+    if not browser:
+        return scraper.scrape_nike_shoes()
+    # Skip the API so the 'listing-card-' pages and 'Show more results' are exercised
+    listings = scraper.scrape_with_browser()
+    if not listings:
+        return False
+    result = scraper.process_listings(listings)
+    scraper.store.advance_watermark(scraper.SEARCH_QUERY, listings, scraper.region.code,
+                                    complete=scraper.crawl_complete)
+    return result
+
+
+def wait_for_outbox(scraper, timeout):
+    """Waits for the delivery worker to empty the outbox. Returns False if it timed out first."""
+    deadline = time.time() + timeout
+    while scraper.store.outbox_counts().get('pending'):
+        if time.time() >= deadline:
+            return False
+        time.sleep(0.5)
+    return True
+
+
+def run(args):
+    carousell = multiprocessing.Process(target=fake_carousell.serve, args=(args.carousell_port,), kwargs={
+        'initial_listings': args.initial_listings,
+        'new_per_minute': args.new_per_minute,
+        'promoted': args.promoted,
+        'challenge_rate': args.challenge_rate,
+        'seed': args.seed,
+    }, daemon=True)
+    discord = multiprocessing.Process(target=fake_discord.serve, args=(args.discord_port,), kwargs={
+        'bucket_limit': args.webhook_limit,
+        'bucket_window': args.webhook_window,
+    }, daemon=True)
+    carousell.start()
+    discord.start()
+
+    db_dir = tempfile.mkdtemp(prefix='carousell-loadtest-')
+    try:
+        wait_for_port(args.carousell_port)
+        wait_for_port(args.discord_port)
+
+        base_url = f"http://127.0.0.1:{args.carousell_port}"
+        scraper = CarousellScraper(
+            base_url=base_url,
+            search_url=f"{base_url}/search/nike%20shoes",
+            notifier=WebhookNotifier(f"http://127.0.0.1:{args.discord_port}/api/webhooks/1/loadtest"),
+            db_path=os.path.join(db_dir, 'products.db'),
+        )
+
+        warmup_drained = None
+        if args.warmup:
+            # Announce the initial inventory before measuring, so steady-state latency isn't buried under it.
+            # Draining that backlog takes a while; the second cycle picks up what was listed meanwhile.
+            for _ in range(2):
+                run_cycle(scraper, args.browser)
+                warmup_drained = wait_for_outbox(scraper, args.drain_timeout)
+
+        usage_start = resource.getrusage(resource.RUSAGE_SELF)
+        started = time.time()
+        cycles = 0
+        cycle_errors = 0
+        while time.time() - started < args.duration:
+            cycle_started = time.time()
+            try:
+                run_cycle(scraper, args.browser)
+            except Exception as e:
+                # A failed cycle is a result to report, not a reason to abandon the run
+                cycle_errors += 1
+                logger.error(f"Scrape cycle failed: {e}")
+            cycles += 1
+            time.sleep(max(0.0, args.interval - (time.time() - cycle_started)))
+        scrape_seconds = time.time() - started
+
+        # Let the delivery worker drain whatever is still queued
+        wait_for_outbox(scraper, args.drain_timeout)
+        usage_end = resource.getrusage(resource.RUSAGE_SELF)
+        wall_seconds = time.time() - started
+
+        queued_ids = [row[0].rsplit(':', 1)[-1] for row in scraper.store.conn.execute(
+            "SELECT idempotency_key FROM outbox WHERE created_at >= ?", (started,)
+        )]
+        outbox_latencies = [row[0] for row in scraper.store.conn.execute(
+            "SELECT delivered_at - created_at FROM outbox WHERE status = 'delivered' AND created_at >= ?", (started,)
+        )]
+        outbox_counts = scraper.store.outbox_counts()
+        delivery_throughput = scraper.delivery_worker.throughput()
+        scraper.cleanup()
+
+        carousell_stats = requests.get(f"{base_url}/_stats", timeout=10).json()
+        discord_stats = requests.get(f"http://127.0.0.1:{args.discord_port}/_stats", timeout=10).json()
+        # Only listings that appeared during the run; the initial inventory was listed before the scraper started
+        created = {pid: at for pid, at in carousell_stats['listings'].items() if at >= started}
+        end_to_end = [received - created[pid] for pid, received in discord_stats['received'].items() if pid in created]
+        # Anything older that was queued during the run is leftover backlog, not steady-state throughput
+        new_count = sum(1 for pid in queued_ids if pid in created)
+
+        cpu_seconds = (usage_end.ru_utime - usage_start.ru_utime) + (usage_end.ru_stime - usage_start.ru_stime)
+        return {
+            'cycles': cycles,
+            'cycle_errors': cycle_errors,
+            'scrape_seconds': round(scrape_seconds, 1),
+            'warmup_drained': warmup_drained,
+            'listings_queued': len(queued_ids),
+            'new_listings_queued': new_count,
+            'listings_per_minute': round(new_count / (scrape_seconds / 60), 1),
+            'carousell_requests': carousell_stats['requests_served'],
+            'carousell_challenges': carousell_stats['challenges_served'],
+            'notifications_accepted': discord_stats['accepted'],
+            'notifications_rate_limited': discord_stats['rate_limited'],
+            'outbox': outbox_counts,
+            'delivery_throughput_per_second': round(delivery_throughput, 2),
+            'enqueue_to_delivery_seconds': summarize(outbox_latencies),
+            'listed_to_notified_seconds': summarize(end_to_end),
+            'cpu_seconds': round(cpu_seconds, 2),
+            'cpu_percent': round(100 * cpu_seconds / wall_seconds, 1),
+            'max_rss_mb': round(usage_end.ru_maxrss / 1024, 1),
+        }
+    finally:
+        carousell.terminate()
+        discord.terminate()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--duration', type=float, default=120, help="seconds to keep scraping")
+    parser.add_argument('--interval', type=float, default=10, help="seconds between scrape cycles")
+    parser.add_argument('--drain-timeout', type=float, default=120,
+                        help="seconds to wait for the outbox to empty after the warmup and after the run")
+    parser.add_argument('--initial-listings', type=int, default=500)
+    parser.add_argument('--new-per-minute', type=float, default=60)
+    parser.add_argument('--promoted', type=int, default=2)
+    parser.add_argument('--challenge-rate', type=float, default=0.0, help="share of requests answered with 'Just a moment'")
+    parser.add_argument('--webhook-limit', type=int, default=5)
+    parser.add_argument('--webhook-window', type=float, default=2.0)
+    parser.add_argument('--carousell-port', type=int, default=8081)
+    parser.add_argument('--discord-port', type=int, default=8082)
+    parser.add_argument('--no-warmup', dest='warmup', action='store_false',
+                        help="measure from the first cycle, including the initial inventory")
+    parser.add_argument('--browser', action='store_true', help="scrape through Chrome instead of the JSON API")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--log-level', default='WARNING')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level)
+    print(json.dumps(run(args), indent=2))
+
+
+if __name__ == "__main__":
+    main()
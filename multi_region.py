@@ -0,0 +1,96 @@
+"""Runs one crawler per Carousell region concurrently against a shared listings store.
+
+    python multi_region.py MY SG PH HK TW --interval 60
+
+Each region crawls on its own thread with its own rate budget and metrics,
+so adding a region adds capacity instead of slowing the others down. A
+single delivery worker drains the shared outbox for all regions.
+"""
+import os
+import time
+import logging
+import argparse
+import threading
+from CarousellDiscordRequests import CarousellScraper
+from delivery_worker import DeliveryWorker
+from discord_notifier import DiscordNotifier
+from listing_store import DB_PATH
+from regions import DEFAULT_REGION, RateBudget, get_region
+
+logger = logging.getLogger(__name__)
+
+
+class RegionCrawler(threading.Thread):
+    """Runs scrape cycles for one region until stopped."""
+
+    def __init__(self, region, interval, stop_event, db_path=DB_PATH):
+        self.region = get_region(region)
+        super().__init__(name=f"crawler-{self.region.code}", daemon=True)
+        self.interval = interval
+        self.stop_event = stop_event
+        self.db_path = db_path
+        self.scraper = None
+
+    def run(self):
+        # Built on this thread: each crawler owns its SQLite connection and browser
+        self.scraper = CarousellScraper(
+            region=self.region,
+            db_path=self.db_path,
+            rate_budget=RateBudget(self.region.requests_per_minute),
+            deliver=False,
+        )
+        try:
+            while not self.stop_event.is_set():
+                started = time.monotonic()
+                try:
+                    self.scraper.scrape_nike_shoes()
+                except Exception as e:
+                    self.scraper.metrics.increment('errors')
+                    logger.error(f"[{self.region.code}] Scrape cycle failed: {e}")
+                elapsed = time.monotonic() - started
+                self.scraper.metrics.record_cycle(elapsed)
+                logger.info(f"[{self.region.code}] Cycle finished in {elapsed:.1f}s: {self.scraper.metrics.snapshot()}")
+                self.stop_event.wait(max(0.0, self.interval - elapsed))
+        finally:
+            self.scraper.cleanup()
+
+    def metrics(self):
+        return self.scraper.metrics.snapshot() if self.scraper else None
+
+
+def run_regions(region_codes, interval, db_path=DB_PATH, report_every=300):
+    stop_event = threading.Event()
+    crawlers = [RegionCrawler(code, interval, stop_event, db_path) for code in region_codes]
+    worker = DeliveryWorker(DiscordNotifier(), db_path)
+    worker.start()
+    for crawler in crawlers:
+        crawler.start()
+
+    try:
+        while any(crawler.is_alive() for crawler in crawlers):
+            stop_event.wait(report_every)
+            for crawler in crawlers:
+                logger.info(f"Region metrics: {crawler.metrics()}")
+            logger.info(f"Delivered {worker.delivered} notifications ({worker.throughput():.1f}/s)")
+    except KeyboardInterrupt:
+        logger.info("Stopping regional crawlers...")
+    finally:
+        stop_event.set()
+        for crawler in crawlers:
+            crawler.join(timeout=60)
+        worker.stop(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('regions', nargs='*', default=os.getenv('CAROUSELL_REGIONS', DEFAULT_REGION).split(','))
+    parser.add_argument('--interval', type=float, default=60, help="seconds between cycles per region")
+    parser.add_argument('--db-path', default=DB_PATH)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(threadName)s %(levelname)s %(message)s')
+    run_regions([get_region(code.strip()).code for code in args.regions], args.interval, args.db_path)
+
+
+if __name__ == "__main__":
+    main()
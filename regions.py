@@ -0,0 +1,141 @@
+import time
+import threading
+import urllib.parse
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REGION = 'MY'
+
+
+class RegionProfile:
+    """Everything that differs between Carousell marketplaces.
+
+    api_url, mobile_url and bare_url are the marketplace's other hosts, used
+    as fallbacks when the main site is blocked. They are None where a
+    marketplace has no such host.
+    """
+
+    def __init__(self, code, base_url, locale, currency, api_url=None, mobile_url=None, bare_url=None,
+                 requests_per_minute=30):
+        self.code = code
+        self.base_url = base_url
+        self.locale = locale
+        self.currency = currency
+        self.api_url = api_url
+        self.mobile_url = mobile_url
+        self.bare_url = bare_url
+        self.requests_per_minute = requests_per_minute
+
+    def at(self, base_url):
+        """This region served from another host, e.g. a local stand-in, without the marketplace's other hosts."""
+        return RegionProfile(self.code, base_url, self.locale, self.currency,
+                             requests_per_minute=self.requests_per_minute)
+
+    def search_url(self, query):
+        return f"{self.base_url}/search/{urllib.parse.quote(query)}?sort_by=3"
+
+    def api_endpoints(self):
+        """Search API endpoints to try, in order."""
+        endpoints = [
+            f"{self.base_url}/api-service/web/listings/search/",
+            f"{self.base_url}/api/listings/search/",
+        ]
+        if self.api_url:
+            endpoints.append(f"{self.api_url}/v1/search/")
+        endpoints.append(f"{self.base_url}/_next/data/search.json")
+        return endpoints
+
+    def accept_language(self):
+        return f"{self.locale},{self.language};q=0.9"
+
+    @property
+    def language(self):
+        return self.locale.split('-')[0]
+
+    def format_price(self, amount):
+        return f"{self.currency} {amount}"
+
+    def __repr__(self):
+        return f"RegionProfile({self.code!r}, {self.base_url!r})"
+
+
+REGIONS = {
+    'MY': RegionProfile('MY', 'https://www.carousell.com.my', 'en-MY', 'RM',
+                        api_url='https://api.carousell.com.my', mobile_url='https://m.carousell.com.my',
+                        bare_url='https://carousell.com.my'),
+    'SG': RegionProfile('SG', 'https://www.carousell.sg', 'en-SG', 'S$',
+                        api_url='https://api.carousell.sg', mobile_url='https://m.carousell.sg',
+                        bare_url='https://carousell.sg'),
+    'PH': RegionProfile('PH', 'https://www.carousell.ph', 'en-PH', '₱',
+                        api_url='https://api.carousell.ph', mobile_url='https://m.carousell.ph',
+                        bare_url='https://carousell.ph'),
+    'HK': RegionProfile('HK', 'https://www.carousell.com.hk', 'en-HK', 'HK$',
+                        api_url='https://api.carousell.com.hk', mobile_url='https://m.carousell.com.hk',
+                        bare_url='https://carousell.com.hk'),
+    # Taiwan is served from a subdomain of carousell.com, with no www/api/m. variants
+    'TW': RegionProfile('TW', 'https://tw.carousell.com', 'zh-TW', 'NT$'),
+}
+
+
+def get_region(region):
+    """Accepts a region code or profile and returns the profile."""
+    if isinstance(region, RegionProfile):
+        return region
+    try:
+        return REGIONS[region.upper()]
+    except KeyError:
+        raise ValueError(f"Unknown region '{region}', expected one of {', '.join(REGIONS)}")
+
+
+class RateBudget:
+    """Token bucket limiting one region's requests to Carousell.
+
+    Each region gets its own budget, so a slow or throttled region never
+    spends another region's allowance.
+    """
+
+    def __init__(self, requests_per_minute, burst=None):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = burst or max(1, requests_per_minute // 6)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.waited_seconds = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a request may be made."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            self.waited_seconds += wait
+        if wait:
+            time.sleep(wait)
+
+
+class RegionMetrics:
+    """Per-region crawl counters, safe to update from the region's crawler thread."""
+
+    FIELDS = ('cycles', 'requests', 'listings_seen', 'new_listings', 'errors')
+
+    def __init__(self, region_code):
+        self.region_code = region_code
+        self.lock = threading.Lock()
+        self.counts = dict.fromkeys(self.FIELDS, 0)
+        self.last_cycle_seconds = None
+
+    def increment(self, field, amount=1):
+        with self.lock:
+            self.counts[field] += amount
+
+    def record_cycle(self, seconds):
+        with self.lock:
+            self.counts['cycles'] += 1
+            self.last_cycle_seconds = seconds
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.counts, region=self.region_code, last_cycle_seconds=self.last_cycle_seconds)
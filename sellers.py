@@ -0,0 +1,62 @@
+import os
+import re
+import urllib.parse
+import logging
+
+logger = logging.getLogger(__name__)
+
+SELLER_SLUG_PATTERN = re.compile(r"/u/([^/?#]+)")
+
+
+def canonical_seller_slug(seller_url):
+    """Returns the lowercase seller slug from a profile URL, ignoring tracking parameters."""
+    if not seller_url:
+        return None
+    match = SELLER_SLUG_PATTERN.search(urllib.parse.urlparse(seller_url).path)
+    if not match:
+        return None
+    return urllib.parse.unquote(match.group(1)).strip().lower() or None
+
+
+def canonical_seller_url(seller_url):
+    """Strips query parameters and fragments (t-id, t-source, ...) from a seller profile URL."""
+    if not seller_url:
+        return seller_url
+    parsed = urllib.parse.urlparse(seller_url)
+    return urllib.parse.urlunparse(parsed._replace(query='', fragment=''))
+
+
+class SellerFilter:
+    """In-memory seller blocklist/allowlist checked before notifying.
+
+    Both lists hold canonical seller slugs, so a lookup is a single set membership test.
+    An empty allowlist allows every seller that is not blocked.
+    """
+
+    def __init__(self, blocklist=None, allowlist=None):
+        self.blocklist = frozenset(self._normalize(blocklist))
+        self.allowlist = frozenset(self._normalize(allowlist))
+
+    @staticmethod
+    def _normalize(slugs):
+        return (slug.strip().lower() for slug in (slugs or []) if slug and slug.strip())
+
+    @classmethod
+    def from_env(cls):
+        """Builds a filter from comma-separated SELLER_BLOCKLIST / SELLER_ALLOWLIST variables."""
+        return cls(
+            blocklist=os.getenv('SELLER_BLOCKLIST', '').split(','),
+            allowlist=os.getenv('SELLER_ALLOWLIST', '').split(','),
+        )
+
+    def allows_slug(self, slug):
+        if slug in self.blocklist:
+            return False
+        return not self.allowlist or slug in self.allowlist
+
+    def allows(self, listing):
+        """Checks a listing dict against the block/allow lists by its seller slug."""
+        slug = listing.get('seller_slug') or canonical_seller_slug(listing.get('seller_url'))
+        if slug is None:
+            return not self.allowlist
+        return self.allows_slug(slug)
@@ -0,0 +1,15 @@
+import os
+import sys
+import pytest
+
+# The modules live at the repository root rather than in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from listing_store import ListingStore  # noqa: E402
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ListingStore(str(tmp_path / 'products.db'))
+    yield store
+    store.close()
@@ -0,0 +1,107 @@
+import json
+import sqlite3
+import pytest
+from listing_store import ListingStore
+
+# Tables as written before listings, sellers and watermarks were keyed by region
+PRE_REGION_SCHEMA = '''
+    CREATE TABLE listings (
+        product_id TEXT UNIQUE, title TEXT, link TEXT, img TEXT, price TEXT, seller_name TEXT,
+        seller_url TEXT, time_posted TEXT, condition TEXT, size TEXT, likes TEXT,
+        seller_slug TEXT REFERENCES sellers(seller_slug), price_value REAL
+    );
+    CREATE INDEX idx_listings_seller_price ON listings(seller_slug, price_value);
+    CREATE TABLE sellers (
+        seller_slug TEXT PRIMARY KEY, seller_name TEXT, seller_url TEXT,
+        listing_count INTEGER NOT NULL DEFAULT 0, priced_count INTEGER NOT NULL DEFAULT 0,
+        median_price REAL, first_seen TEXT, last_seen TEXT
+    );
+    CREATE TABLE watermarks (query TEXT PRIMARY KEY, product_id INTEGER NOT NULL, seen_at TEXT NOT NULL);
+    CREATE TABLE outbox (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, idempotency_key TEXT NOT NULL UNIQUE, product_id TEXT NOT NULL,
+        payload TEXT NOT NULL, status TEXT NOT NULL DEFAULT 'pending', attempts INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT, created_at REAL NOT NULL, next_attempt_at REAL NOT NULL, delivered_at REAL
+    );
+'''
+
+
+@pytest.fixture
+def pre_region_db(tmp_path):
+    db_path = str(tmp_path / 'products.db')
+    conn = sqlite3.connect(db_path)
+    conn.executescript(PRE_REGION_SCHEMA)
+    conn.executemany(
+        "INSERT INTO listings (product_id, title, price, seller_url, seller_slug, price_value) VALUES (?, ?, ?, ?, ?, ?)",
+        [('1001', 'Nike Dunk Low', 'RM300', 'https://www.carousell.com.my/u/shoe_shop/', 'shoe_shop', 300.0),
+         ('1002', 'Nike Air Max 90', 'RM250', 'https://www.carousell.com.my/u/shoe_shop/', 'shoe_shop', 250.0)]
+    )
+    conn.execute("INSERT INTO sellers VALUES ('shoe_shop', 'Shoe Shop', 'https://www.carousell.com.my/u/shoe_shop/', "
+                 "2, 2, 275.0, '2024-01-01T00:00:00Z', '2024-02-01T00:00:00Z')")
+    conn.execute("INSERT INTO watermarks VALUES ('nike shoes', 1002, '2024-02-01T00:00:00Z')")
+    conn.execute("INSERT INTO outbox (idempotency_key, product_id, payload, created_at, next_attempt_at) "
+                 "VALUES ('listing:1002', '1002', ?, 0, 0)", (json.dumps({'product_id': '1002'}),))
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+def test_migration_keeps_rows_as_default_region(pre_region_db):
+    store = ListingStore(pre_region_db)
+    try:
+        rows = store.conn.execute("SELECT region, product_id, price_value FROM listings ORDER BY product_id").fetchall()
+        assert [tuple(row) for row in rows] == [('MY', '1001', 300.0), ('MY', '1002', 250.0)]
+        assert store.product_exists('1001', 'MY')
+        assert not store.product_exists('1001', 'SG')
+
+        seller = store.get_seller('shoe_shop', 'MY')
+        assert (seller['listing_count'], seller['median_price'], seller['first_seen']) == (2, 275.0, '2024-01-01T00:00:00Z')
+        assert store.get_watermark('nike shoes', 'MY') == 1002
+        assert store.get_watermark('nike shoes', 'SG') is None
+
+        claimed = store.claim_outbox(10, 60)
+        assert [row['payload'] for row in claimed] == [{'product_id': '1002'}]
+        assert store.conn.execute("SELECT region FROM outbox").fetchone()[0] == 'MY'
+    finally:
+        store.close()
+
+
+def test_migrated_store_keys_listings_by_region(pre_region_db):
+    store = ListingStore(pre_region_db)
+    try:
+        # The same product id in another marketplace is a different listing
+        assert store.save_listing({'product_id': '1001', 'title': 'Nike Dunk Low', 'price': 'S$90'}, region='SG')
+        assert not store.save_listing({'product_id': '1001', 'title': 'Nike Dunk Low'}, region='MY')
+        assert store.outbox_counts() == {'pending': 2}
+    finally:
+        store.close()
+
+
+def test_migration_runs_once(pre_region_db):
+    ListingStore(pre_region_db).close()
+    store = ListingStore(pre_region_db)
+    try:
+        assert store.conn.execute("SELECT COUNT(*) FROM listings").fetchone()[0] == 2
+        tables = {row[0] for row in store.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        assert not any(name.endswith('_regional') for name in tables)
+    finally:
+        store.close()
+
+
+def test_baseline_database_without_seller_columns_migrates(tmp_path):
+    db_path = str(tmp_path / 'products.db')
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE listings (product_id TEXT UNIQUE, title TEXT, link TEXT, img TEXT, price TEXT, "
+                 "seller_name TEXT, seller_url TEXT, time_posted TEXT, condition TEXT, size TEXT, likes TEXT)")
+    conn.execute("INSERT INTO listings (product_id, title, price, seller_url) VALUES "
+                 "('1001', 'Nike Dunk Low', 'RM300', 'https://www.carousell.com.my/u/Shoe_Shop/?t-id=abc')")
+    conn.commit()
+    conn.close()
+
+    store = ListingStore(db_path)
+    try:
+        assert store.backfill_sellers() == 1
+        seller = store.get_seller('shoe_shop', 'MY')
+        assert (seller['listing_count'], seller['median_price']) == (1, 300.0)
+        assert seller['seller_url'] == 'https://www.carousell.com.my/u/Shoe_Shop/'
+    finally:
+        store.close()
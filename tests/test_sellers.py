@@ -0,0 +1,49 @@
+def make_listing(product_id, price=None, seller='shoe_shop'):
+    return {
+        'product_id': str(product_id),
+        'title': f"Nike Dunk Low {product_id}",
+        'link': f"https://www.carousell.com.my/p/nike-dunk-low-{product_id}/",
+        'price': price,
+        'seller_name': seller,
+        'seller_url': f"https://www.carousell.com.my/u/{seller}/?t-id=abc",
+    }
+
+
+def test_median_with_odd_priced_count(store):
+    for product_id, price in ((1, 'RM30'), (2, 'RM10'), (3, 'RM1,200')):
+        store.save_listing(make_listing(product_id, price), notify=False)
+
+    seller = store.get_seller('shoe_shop')
+    assert seller['listing_count'] == 3
+    assert seller['priced_count'] == 3
+    assert seller['median_price'] == 30
+
+
+def test_median_with_even_priced_count_ignores_unpriced(store):
+    for product_id, price in ((1, 'RM40'), (2, 'RM10'), (3, None), (4, 'RM20'), (5, 'RM 75.50')):
+        store.save_listing(make_listing(product_id, price), notify=False)
+
+    seller = store.get_seller('shoe_shop')
+    assert seller['listing_count'] == 5
+    assert seller['priced_count'] == 4
+    assert seller['median_price'] == 30
+
+
+def test_median_is_none_without_prices(store):
+    store.save_listing(make_listing(1), notify=False)
+
+    assert store.get_seller('shoe_shop')['median_price'] is None
+
+
+def test_backfill_keeps_seller_timestamps(store):
+    for product_id, price in ((1, 'RM10'), (2, 'RM20')):
+        store.save_listing(make_listing(product_id, price), notify=False)
+    with store.conn:
+        store.conn.execute("UPDATE sellers SET first_seen = '2024-01-01T00:00:00Z', listing_count = 99")
+
+    store.backfill_sellers()
+
+    seller = store.get_seller('shoe_shop')
+    assert seller['first_seen'] == '2024-01-01T00:00:00Z'
+    assert seller['listing_count'] == 2
+    assert seller['median_price'] == 15
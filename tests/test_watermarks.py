@@ -0,0 +1,56 @@
+from listing_store import page_below_watermark
+
+
+def page(*product_ids):
+    return [{'product_id': str(product_id)} for product_id in product_ids]
+
+
+def test_page_without_watermark_is_never_stale():
+    assert not page_below_watermark(page(1, 2, 3), None, 0.8)
+
+
+def test_page_is_stale_at_the_ratio():
+    # 4 of 5 listings at or below the mark
+    assert page_below_watermark(page(90, 100, 80, 70, 120), 100, 0.8)
+
+
+def test_promoted_listings_alone_do_not_stop_the_crawl():
+    # 2 old promoted listings pinned above 8 new ones
+    assert not page_below_watermark(page(10, 20, 101, 102, 103, 104, 105, 106, 107, 108), 100, 0.8)
+
+
+def test_non_numeric_ids_are_ignored():
+    assert page_below_watermark(page('promo-a', 'promo-b', 50, 60), 100, 0.8)
+    assert not page_below_watermark(page('promo-a', 'promo-b'), 100, 0.8)
+
+
+def test_first_crawl_sets_the_mark_even_if_incomplete(store):
+    assert store.advance_watermark('nike shoes', page(5, 9, 7), complete=False) == 9
+
+
+def test_complete_crawl_advances_the_mark(store):
+    store.advance_watermark('nike shoes', page(100))
+
+    assert store.advance_watermark('nike shoes', page(150, 120, 100)) == 150
+
+
+def test_incomplete_crawl_keeps_the_mark(store):
+    store.advance_watermark('nike shoes', page(100))
+
+    # e.g. page 2 failed: listings between page 1 and the mark were never fetched
+    assert store.advance_watermark('nike shoes', page(150, 140), complete=False) == 100
+    assert store.advance_watermark('nike shoes', page(150, 140, 120, 100)) == 150
+
+
+def test_mark_never_moves_down(store):
+    store.advance_watermark('nike shoes', page(100))
+
+    assert store.advance_watermark('nike shoes', page(40, 30)) == 100
+
+
+def test_marks_are_kept_per_region(store):
+    store.advance_watermark('nike shoes', page(100), region='MY')
+    store.advance_watermark('nike shoes', page(7), region='SG')
+
+    assert store.get_watermark('nike shoes', 'MY') == 100
+    assert store.get_watermark('nike shoes', 'SG') == 7